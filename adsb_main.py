@@ -16,6 +16,7 @@ Usage:
 """
 
 import argparse
+import asyncio
 import logging
 import time
 import sys
@@ -29,6 +30,15 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from adsb_sensor import ADSBSensor
 from thermal_streaming_client import SnowpipeStreamingClient
 
+# uvloop (libuv-backed event loop) is 2-4x faster than stdlib asyncio on
+# networked I/O and has ARM64 wheels for the Pi; fall back silently where
+# it isn't installed
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s [%(levelname)s] %(name)s - %(message)s',
@@ -45,22 +55,30 @@ class ADSBStreamingApp:
     
     def __init__(self, config_file: str = 'snowflake_config_adsb.json',
                  batch_size: int = 1, interval: float = 3.0, fast_mode: bool = False,
-                 adsb_url: str = "http://localhost:8080/data/aircraft.json"):
+                 adsb_url: str = "http://localhost:8080/data/aircraft.json",
+                 min_quality: float = 60.0):
         """
         Initialize the application.
-        
+
         Args:
             config_file: Path to Snowflake configuration file
             batch_size: Number of snapshots per batch (each snapshot captures all visible aircraft)
             interval: Seconds between batch sends
             fast_mode: If True, maximize throughput
             adsb_url: URL to the ADS-B aircraft.json endpoint
+            min_quality: Skip aircraft not heard for this many seconds with no
+                         position or callsign; <= 0 streams every row
         """
         self.config_file = config_file
         self.batch_size = batch_size
         self.interval = interval
         self.fast_mode = fast_mode
         self.running = False
+        # Created inside _run_async, not here: on Python 3.9 (Pi OS
+        # Bullseye) an Event built outside a running loop binds to a
+        # throwaway loop and wait() then fails with "attached to a
+        # different loop"
+        self._stop_event: Optional[asyncio.Event] = None
         
         logger.info("=" * 70)
         logger.info("ADS-B Aircraft Streaming Application - PRODUCTION MODE")
@@ -76,29 +94,37 @@ class ADSBStreamingApp:
         self.sensor = ADSBSensor(
             adsb_url=adsb_url,
             simulate=False,
-            require_real_sensors=False
+            require_real_sensors=False,
+            stale_seen=min_quality
         )
         
         logger.info("Initializing Snowpipe Streaming REST API client...")
         self.client = SnowpipeStreamingClient(config_file)
+
+        # Deterministic channel name so a restart under systemd/kubernetes
+        # recovers the same channel instead of opening a fresh one each time
+        self.client.channel_name = f"adsb-{self.sensor.hostname}-{os.getpid()}"
+        logger.info("Channel name: %s", self.client.channel_name)
         
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
         
         logger.info("Initialization complete")
-        logger.info(f"Batch size: {batch_size} snapshot(s)")
-        logger.info(f"Batch interval: {interval} seconds")
-        logger.info(f"ADS-B URL: {adsb_url}")
+        logger.info("Batch size: %d snapshot(s)", batch_size)
+        logger.info("Batch interval: %s seconds", interval)
+        logger.info("ADS-B URL: %s", adsb_url)
         if fast_mode:
             logger.info("FAST MODE: Enabled for maximum throughput")
         
-        logger.info(f"Local hostname: {self.sensor.hostname}")
-        logger.info(f"Local IP: {self.sensor.ip_address}")
+        logger.info("Local hostname: %s", self.sensor.hostname)
+        logger.info("Local IP: %s", self.sensor.ip_address)
     
     def _signal_handler(self, signum, frame):
         """Handle shutdown signals."""
-        logger.info(f"\nReceived signal {signum}, shutting down gracefully...")
+        logger.info("\nReceived signal %s, shutting down gracefully...", signum)
         self.running = False
+        if self._stop_event is not None:
+            self._stop_event.set()
     
     def initialize(self):
         """Initialize the Snowpipe Streaming connection."""
@@ -107,7 +133,7 @@ class ADSBStreamingApp:
         try:
             logger.info("Discovering ingest host...")
             ingest_host = self.client.discover_ingest_host()
-            logger.info(f"[OK] Ingest host: {ingest_host}")
+            logger.info("[OK] Ingest host: %s", ingest_host)
             
             logger.info("Opening streaming channel...")
             self.client.open_channel()
@@ -117,92 +143,159 @@ class ADSBStreamingApp:
             return True
             
         except Exception as e:
-            logger.error(f"Failed to initialize streaming: {e}", exc_info=True)
+            logger.error("Failed to initialize streaming: %s", e, exc_info=True)
             return False
     
     def run(self):
-        """Main application loop."""
+        """Run the application's asyncio event loop."""
+        return asyncio.run(self._run_async())
+
+    async def _send_snapshot(self, payload, prev_send=None, max_attempts: int = 4):
+        """
+        Send one snapshot's pre-encoded payload to Snowpipe Streaming.
+
+        Sends are chained: each awaits the previous snapshot's task first,
+        so the single channel only ever has one append in flight and
+        batches land in capture order (overlapping appends on one channel
+        would replay the same offset and be dropped by server-side dedupe).
+
+        Transient failures are retried with exponential backoff on the SAME
+        channel - Snowpipe channels are meant to be long-lived, so we never
+        tear the channel down and reopen it from the ingest path.
+        """
+        if prev_send is not None:
+            await prev_send
+
+        if not payload:
+            return
+
+        for attempt in range(max_attempts):
+            try:
+                row_count = await self.client.insert_rows_raw_async(payload)
+                logger.info("[OK] Successfully sent %d aircraft records to Snowpipe Streaming", row_count)
+                return
+
+            except Exception as e:
+                logger.error("Failed to insert batch (attempt %d/%d): %s", attempt + 1, max_attempts, e)
+                if attempt < max_attempts - 1:
+                    await asyncio.sleep(0.5 * (2 ** attempt))
+
+        logger.error("Giving up on batch after retries; channel left open for next batch")
+
+    async def _run_async(self):
+        """Main application loop: stream each snapshot out while the next is captured."""
+        # Bind the stop event to the loop asyncio.run just started
+        self._stop_event = asyncio.Event()
+
         if not self.initialize():
             logger.error("Initialization failed, exiting")
             return 1
-        
+
+        await self.sensor.connect()
+
         self.running = True
         batch_count = 0
         total_aircraft = 0
-        
+
         logger.info("=" * 70)
         logger.info("Starting ADS-B data collection and streaming...")
         logger.info("Press Ctrl+C to stop")
         logger.info("=" * 70)
-        
+
         try:
             while self.running:
                 batch_count += 1
-                batch_start = time.time()
-                
-                logger.info(f"\n--- Batch {batch_count} ---")
-                
+                batch_start = time.monotonic()
+
+                logger.info("\n--- Batch %d ---", batch_count)
+
                 if self.fast_mode:
-                    readings = self.sensor.read_batch(
+                    snapshots = self.sensor.iter_batch(
                         count=self.batch_size,
                         interval=1.0,
                         fast_mode=True
                     )
                 else:
-                    readings = self.sensor.read_batch(
+                    snapshots = self.sensor.iter_batch(
                         count=self.batch_size,
                         interval=max(3.0, self.interval / self.batch_size)
                     )
-                
+
+                # Stream each snapshot out while the next is captured:
+                # records are encoded here, before the sensor's pooled
+                # dicts can be reused, and the send tasks form a chain so
+                # only one append is ever in flight on the channel
+                readings = []
+                send_chain = None
+                async for snapshot in snapshots:
+                    if snapshot:
+                        payload = ADSBSensor.encode_records(snapshot)
+                        send_chain = asyncio.create_task(
+                            self._send_snapshot(payload, send_chain)
+                        )
+                    readings.extend(snapshot)
+
+                if send_chain is not None:
+                    await send_chain
+
                 if readings:
                     total_aircraft += len(readings)
                     sample = readings[0]
-                    
-                    flights_with_callsign = sum(1 for r in readings if r.get('flight'))
-                    flights_with_position = sum(1 for r in readings if r.get('latitude') and r.get('longitude'))
-                    
-                    logger.info(f"Captured {len(readings)} aircraft records")
-                    logger.info(f"  With callsign: {flights_with_callsign}")
-                    logger.info(f"  With position: {flights_with_position}")
-                    
-                    if sample.get('flight'):
-                        logger.info(f"Sample: {sample.get('flight')} "
-                                   f"Alt={sample.get('altitude_baro')}ft "
-                                   f"GS={sample.get('ground_speed'):.0f}kts "
-                                   f"Lat={sample.get('latitude'):.4f}" if sample.get('latitude') else "")
+
+                    if logger.isEnabledFor(logging.INFO):
+                        # Single pass; lat/lon compared against None so a
+                        # 0.0 coordinate still counts as a position
+                        flights_with_callsign = 0
+                        flights_with_position = 0
+                        for r in readings:
+                            if r.get('flight'):
+                                flights_with_callsign += 1
+                            if r.get('latitude') is not None and r.get('longitude') is not None:
+                                flights_with_position += 1
+
+                        logger.info("Captured %d aircraft records", len(readings))
+                        logger.info("  With callsign: %d", flights_with_callsign)
+                        logger.info("  With position: %d", flights_with_position)
+
+                        if (sample.get('flight')
+                                and sample.get('ground_speed') is not None
+                                and sample.get('latitude') is not None):
+                            logger.info("Sample: %s Alt=%sft GS=%.0fkts Lat=%.4f",
+                                        sample.get('flight'),
+                                        sample.get('altitude_baro'),
+                                        sample.get('ground_speed'),
+                                        sample.get('latitude'))
                 else:
                     logger.warning("No aircraft currently visible")
                     readings = []
-                
-                if readings:
-                    try:
-                        row_count = self.client.insert_rows(readings)
-                        logger.info(f"[OK] Successfully sent {row_count} aircraft records to Snowpipe Streaming")
-                        
-                    except Exception as e:
-                        logger.error(f"Failed to insert batch: {e}")
-                
+
                 if batch_count % 10 == 0:
                     self.client.print_statistics()
-                    logger.info(f"Total aircraft records sent: {total_aircraft}")
-                
-                batch_elapsed = time.time() - batch_start
+                    logger.info("Total aircraft records sent: %d", total_aircraft)
+
+                batch_elapsed = time.monotonic() - batch_start
                 sleep_time = max(0, self.interval - batch_elapsed)
-                
+
                 if sleep_time > 0 and self.running:
-                    logger.info(f"Waiting {sleep_time:.1f}s until next batch...")
-                    time.sleep(sleep_time)
-        
+                    logger.info("Waiting %.1fs until next batch...", sleep_time)
+                    # Wakes immediately when the signal handler sets the
+                    # stop event instead of sleeping out the full interval
+                    try:
+                        await asyncio.wait_for(self._stop_event.wait(), timeout=sleep_time)
+                        break
+                    except asyncio.TimeoutError:
+                        pass
+
         except Exception as e:
-            logger.error(f"Error in main loop: {e}", exc_info=True)
+            logger.error("Error in main loop: %s", e, exc_info=True)
             return 1
-        
+
         finally:
-            self.shutdown()
-        
+            await self.shutdown()
+
         return 0
-    
-    def shutdown(self):
+
+    async def shutdown(self):
         """Graceful shutdown."""
         logger.info("\n" + "=" * 70)
         logger.info("Shutting down...")
@@ -213,14 +306,15 @@ class ADSBStreamingApp:
             
             logger.info("Closing streaming channel...")
             self.client.close_channel()
+            await self.client.aclose()
             logger.info("[OK] Channel closed")
             
             logger.info("Cleaning up sensor...")
-            self.sensor.cleanup()
+            await self.sensor.cleanup()
             logger.info("[OK] Sensor cleaned up")
             
         except Exception as e:
-            logger.error(f"Error during shutdown: {e}")
+            logger.error("Error during shutdown: %s", e)
         
         logger.info("Shutdown complete")
 
@@ -249,8 +343,16 @@ def main():
     )
     parser.add_argument(
         '--adsb-url',
-        default='http://localhost:8080/data/aircraft.json',
-        help='URL to ADS-B aircraft.json endpoint'
+        action='append',
+        help='URL to ADS-B aircraft.json endpoint; repeat to fuse multiple '
+             'receivers (default: http://localhost:8080/data/aircraft.json)'
+    )
+    parser.add_argument(
+        '--min-quality',
+        type=float,
+        default=60.0,
+        help='Skip aircraft not heard for this many seconds that lack position '
+             'and callsign; 0 streams every row (default: 60)'
     )
     parser.add_argument(
         '--verbose',
@@ -275,7 +377,8 @@ def main():
         batch_size=args.batch_size,
         interval=args.interval,
         fast_mode=args.fast,
-        adsb_url=args.adsb_url
+        adsb_url=args.adsb_url or 'http://localhost:8080/data/aircraft.json',
+        min_quality=args.min_quality
     )
     
     exit_code = app.run()
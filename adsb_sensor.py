@@ -13,18 +13,102 @@ Based on:
 - https://github.com/tspannhw/AIM-ADS-B
 """
 
+import asyncio
 import json
 import logging
+import secrets
 import socket
 import time
 import uuid
-import requests
-from datetime import datetime, timezone
-from typing import Dict, List, Optional
+import aiohttp
+import msgspec
+import numpy as np
+import orjson
+from typing import AsyncIterator, Dict, List, Optional, Union
 import threading
 
 logger = logging.getLogger(__name__)
 
+# Shared generator for simulated data; one vectorized draw per field
+# replaces hundreds of Python-level random.* calls per snapshot
+_rng = np.random.default_rng()
+
+
+class Aircraft(msgspec.Struct):
+    """One entry of dump1090's aircraft.json, decoded straight into typed slots."""
+    hex: Optional[str] = None
+    flight: Optional[str] = None
+    r: Optional[str] = None
+    t: Optional[str] = None
+    desc: Optional[str] = None
+    alt_baro: Union[int, str, None] = None  # "ground" when on the surface
+    alt_geom: Optional[int] = None
+    gs: Optional[float] = None
+    track: Optional[float] = None
+    true_heading: Optional[float] = None
+    mag_heading: Optional[float] = None
+    ias: Optional[float] = None
+    tas: Optional[float] = None
+    mach: Optional[float] = None
+    baro_rate: Optional[int] = None
+    geom_rate: Optional[int] = None
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+    nav_altitude_mcp: Optional[int] = None
+    nav_heading: Optional[float] = None
+    nav_qnh: Optional[float] = None
+    squawk: Optional[str] = None
+    category: Optional[str] = None
+    emergency: Optional[str] = None
+    rssi: Optional[float] = None
+    messages: Optional[int] = None
+    seen: Optional[float] = None
+    seen_pos: Optional[float] = None
+
+
+class Feed(msgspec.Struct):
+    """Top level of aircraft.json."""
+    now: float = 0.0
+    messages: int = 0
+    aircraft: List[Aircraft] = []
+
+
+# One reusable decoder; holds its parse state across calls
+_FEED_DECODER = msgspec.json.Decoder(Feed)
+
+# Output-field -> aircraft.json-field mapping for the pass-through columns.
+# Built once at import so read() loops over shared key objects instead of
+# executing ~30 literal ac.get() calls per aircraft.
+_FIELD_MAP = (
+    ('icao_hex', 'hex'),
+    ('registration', 'r'),
+    ('aircraft_type', 't'),
+    ('description', 'desc'),
+    ('altitude_baro', 'alt_baro'),
+    ('altitude_geom', 'alt_geom'),
+    ('ground_speed', 'gs'),
+    ('track', 'track'),
+    ('true_heading', 'true_heading'),
+    ('mag_heading', 'mag_heading'),
+    ('indicated_airspeed', 'ias'),
+    ('true_airspeed', 'tas'),
+    ('mach', 'mach'),
+    ('vertical_rate', 'baro_rate'),
+    ('vertical_rate_geom', 'geom_rate'),
+    ('latitude', 'lat'),
+    ('longitude', 'lon'),
+    ('nav_altitude', 'nav_altitude_mcp'),
+    ('nav_heading', 'nav_heading'),
+    ('nav_qnh', 'nav_qnh'),
+    ('squawk', 'squawk'),
+    ('category', 'category'),
+    ('emergency', 'emergency'),
+    ('rssi', 'rssi'),
+    ('messages', 'messages'),
+    ('seen', 'seen'),
+    ('seen_pos', 'seen_pos'),
+)
+
 
 class ADSBSensor:
     """
@@ -34,21 +118,28 @@ class ADSBSensor:
     The receiver (dump1090, readsb, etc.) provides JSON data via HTTP.
     """
     
-    def __init__(self, 
-                 adsb_url: str = "http://localhost:8080/data/aircraft.json",
+    def __init__(self,
+                 adsb_url: Union[str, List[str]] = "http://localhost:8080/data/aircraft.json",
                  simulate: bool = False,
-                 require_real_sensors: bool = False):
+                 require_real_sensors: bool = False,
+                 stale_seen: float = 60.0):
         """
         Initialize the ADS-B sensor.
-        
+
         Args:
-            adsb_url: URL to the aircraft.json endpoint
+            adsb_url: URL to the aircraft.json endpoint, or a list of URLs
+                      when fusing multiple receivers (fetched concurrently,
+                      merged by ICAO hex preferring the strongest signal)
             simulate: If True, generate simulated data (for testing)
             require_real_sensors: If True, raise error if can't connect to real sensor
+            stale_seen: Skip aircraft not heard for this many seconds that
+                        also lack a position and callsign; <= 0 emits every row
         """
-        self.adsb_url = adsb_url
+        self.adsb_urls = [adsb_url] if isinstance(adsb_url, str) else list(adsb_url)
+        self.adsb_url = self.adsb_urls[0]
         self.simulate = simulate
         self.require_real_sensors = require_real_sensors
+        self.stale_seen = stale_seen
         
         self.hostname = socket.gethostname()
         self.ip_address = self._get_ip_address()
@@ -58,17 +149,39 @@ class ADSBSensor:
         self._last_data = None
         self._last_fetch_time = 0
         self._fetch_interval = 1.0
-        
-        logger.info(f"ADS-B Sensor initialized")
-        logger.info(f"  Data URL: {self.adsb_url}")
-        logger.info(f"  Hostname: {self.hostname}")
-        logger.info(f"  IP: {self.ip_address}")
-        
-        if not simulate:
-            self._verify_connection()
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Recycled per-aircraft dicts for iter_read(reuse_records=True);
+        # each pool grows to the high-water mark of visible aircraft and
+        # then stops allocating. Two pools alternate so a snapshot can
+        # still be serialized while the next one is being read. Only the
+        # serialize-immediately path uses them - list-returning APIs hand
+        # out fresh dicts so accumulated snapshots never alias each other.
+        self._record_pools = ([], [])
+        self._pool_index = 0
+
+        logger.info("ADS-B Sensor initialized")
+        logger.info("  Data URL: %s", self.adsb_url)
+        logger.info("  Hostname: %s", self.hostname)
+        logger.info("  IP: %s", self.ip_address)
+
+    async def connect(self):
+        """
+        Create the persistent HTTP session and verify the receiver.
+
+        Call once from the event loop before the first read(); the session
+        is reused for every fetch afterwards.
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=10),
+                headers={'Cache-Control': 'no-cache'}
+            )
+
+        if not self.simulate:
+            await self._verify_connection()
     
     def _get_ip_address(self) -> str:
-        """Get the local IP address."""
+        """Get the local IP address (computed once in __init__)."""
         try:
             s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             s.connect(("8.8.8.8", 80))
@@ -79,34 +192,25 @@ class ADSBSensor:
             return "127.0.0.1"
     
     def _get_mac_address(self) -> str:
-        """Get the MAC address."""
+        """Get the MAC address (computed once in __init__)."""
         try:
-            import uuid as uuid_mod
-            mac = uuid_mod.getnode()
-            return ':'.join(('%012x' % mac)[i:i+2] for i in range(0, 12, 2))
+            m = format(uuid.getnode(), '012x')
+            return f"{m[0:2]}:{m[2:4]}:{m[4:6]}:{m[6:8]}:{m[8:10]}:{m[10:12]}"
         except Exception:
             return "00:00:00:00:00:00"
     
-    def _get_cache_busted_url(self) -> str:
-        """Get URL with random query string to prevent caching."""
-        import random
-        cache_buster = f"nocache={int(time.time() * 1000)}_{random.randint(1000, 9999)}"
-        separator = '&' if '?' in self.adsb_url else '?'
-        return f"{self.adsb_url}{separator}{cache_buster}"
-    
-    def _verify_connection(self):
+    async def _verify_connection(self):
         """Verify connection to ADS-B receiver."""
         try:
-            url = self._get_cache_busted_url()
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            aircraft_count = len(data.get('aircraft', []))
-            logger.info(f"[OK] Connected to ADS-B receiver")
-            logger.info(f"[OK] Currently tracking {aircraft_count} aircraft")
-            
-        except requests.exceptions.RequestException as e:
+            async with self._session.get(self.adsb_url) as response:
+                response.raise_for_status()
+                data = _FEED_DECODER.decode(await response.read())
+
+            aircraft_count = len(data.aircraft)
+            logger.info("[OK] Connected to ADS-B receiver")
+            logger.info("[OK] Currently tracking %d aircraft", aircraft_count)
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             msg = f"Cannot connect to ADS-B receiver at {self.adsb_url}: {e}"
             if self.require_real_sensors:
                 logger.error(msg)
@@ -114,213 +218,331 @@ class ADSBSensor:
             else:
                 logger.warning(msg)
                 logger.warning("Will retry on each read attempt")
-    
-    def _fetch_aircraft_data(self) -> Dict:
-        """Fetch raw aircraft data from the ADS-B receiver."""
+
+    async def _fetch_one(self, url: str) -> Optional[Feed]:
+        """Fetch one receiver's feed; None on failure."""
+        try:
+            async with self._session.get(url) as response:
+                response.raise_for_status()
+                return _FEED_DECODER.decode(await response.read())
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning("Failed to fetch ADS-B data from %s: %s", url, e)
+            return None
+
+    @staticmethod
+    def _merge_feeds(feeds: List[Feed]) -> Feed:
+        """Merge multi-receiver feeds by ICAO hex, keeping the strongest signal."""
+        by_hex = {}
+        no_hex = []
+        for feed in feeds:
+            for ac in feed.aircraft:
+                if ac.hex is None:
+                    no_hex.append(ac)
+                    continue
+                current = by_hex.get(ac.hex)
+                if current is None or (ac.rssi or -999) > (current.rssi or -999):
+                    by_hex[ac.hex] = ac
+
+        return Feed(
+            now=max(feed.now for feed in feeds),
+            messages=sum(feed.messages for feed in feeds),
+            aircraft=list(by_hex.values()) + no_hex
+        )
+
+    async def _fetch_aircraft_data(self) -> Feed:
+        """Fetch raw aircraft data from the ADS-B receiver(s)."""
         if self.simulate:
             return self._generate_simulated_data()
-        
-        try:
-            url = self._get_cache_busted_url()
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            self._last_data = data
-            self._last_fetch_time = time.time()
-            return data
-            
-        except requests.exceptions.RequestException as e:
-            logger.warning(f"Failed to fetch ADS-B data: {e}")
+
+        if self._session is None or self._session.closed:
+            await self.connect()
+
+        # All receivers are fetched concurrently, so one slow dongle only
+        # costs its own latency, not the sum
+        feeds = [
+            feed for feed in
+            await asyncio.gather(*(self._fetch_one(url) for url in self.adsb_urls))
+            if feed is not None
+        ]
+
+        if not feeds:
             if self._last_data and (time.time() - self._last_fetch_time) < 30:
                 logger.warning("Using cached data")
                 return self._last_data
-            return {'aircraft': [], 'now': time.time(), 'messages': 0}
+            return Feed(now=time.time())
+
+        data = feeds[0] if len(feeds) == 1 else self._merge_feeds(feeds)
+        self._last_data = data
+        self._last_fetch_time = time.time()
+        return data
     
-    def _generate_simulated_data(self) -> Dict:
+    def _generate_simulated_data(self) -> Feed:
         """Generate simulated aircraft data for testing."""
-        import random
-        
-        num_aircraft = random.randint(5, 20)
-        aircraft = []
-        
         airlines = ['UAL', 'DAL', 'AAL', 'SWA', 'JBU', 'ASA', 'NKS', 'FFT']
-        
-        for i in range(num_aircraft):
-            ac = {
-                'hex': f'{random.randint(0xa00000, 0xafffff):06x}',
-                'flight': f'{random.choice(airlines)}{random.randint(100, 9999)}',
-                'alt_baro': random.randint(1000, 45000),
-                'alt_geom': random.randint(1000, 45000),
-                'gs': random.uniform(100, 550),
-                'track': random.uniform(0, 360),
-                'lat': random.uniform(25, 48),
-                'lon': random.uniform(-125, -70),
-                'baro_rate': random.randint(-2000, 2000),
-                'squawk': f'{random.randint(1000, 7777):04d}',
-                'category': random.choice(['A1', 'A2', 'A3', 'A4', 'A5']),
-                'rssi': random.uniform(-30, -5),
-                'messages': random.randint(100, 10000),
-                'seen': random.uniform(0, 10),
-                'seen_pos': random.uniform(0, 30)
-            }
+
+        n = int(_rng.integers(5, 21))
+
+        # One vectorized draw per field instead of ~15 random.* calls
+        # per aircraft
+        hexes = _rng.integers(0xa00000, 0xb00000, n)
+        airline_idx = _rng.integers(0, len(airlines), n)
+        flight_nums = _rng.integers(100, 10000, n)
+        alt_baro = _rng.integers(1000, 45001, n)
+        alt_geom = _rng.integers(1000, 45001, n)
+        gs = _rng.uniform(100, 550, n)
+        track = _rng.uniform(0, 360, n)
+        lat = _rng.uniform(25, 48, n)
+        lon = _rng.uniform(-125, -70, n)
+        baro_rate = _rng.integers(-2000, 2001, n)
+        squawk = _rng.integers(1000, 7778, n)
+        category = _rng.integers(1, 6, n)
+        rssi = _rng.uniform(-30, -5, n)
+        messages = _rng.integers(100, 10001, n)
+        seen = _rng.uniform(0, 10, n)
+        seen_pos = _rng.uniform(0, 30, n)
+
+        aircraft = []
+        for i in range(n):
+            ac = Aircraft(
+                hex=f'{hexes[i]:06x}',
+                flight=f'{airlines[airline_idx[i]]}{flight_nums[i]}',
+                alt_baro=int(alt_baro[i]),
+                alt_geom=int(alt_geom[i]),
+                gs=float(gs[i]),
+                track=float(track[i]),
+                lat=float(lat[i]),
+                lon=float(lon[i]),
+                baro_rate=int(baro_rate[i]),
+                squawk=f'{squawk[i]:04d}',
+                category=f'A{category[i]}',
+                rssi=float(rssi[i]),
+                messages=int(messages[i]),
+                seen=float(seen[i]),
+                seen_pos=float(seen_pos[i])
+            )
             aircraft.append(ac)
-        
-        return {
-            'now': time.time(),
-            'messages': random.randint(100000, 999999),
-            'aircraft': aircraft
-        }
+
+        return Feed(
+            now=time.time(),
+            messages=int(_rng.integers(100000, 1000000)),
+            aircraft=aircraft
+        )
     
-    def read(self) -> List[Dict]:
+    async def iter_read(self, reuse_records: bool = False) -> AsyncIterator[Dict]:
         """
-        Read current aircraft data and format for Snowflake ingestion.
-        
-        Returns:
-            List of aircraft records ready for streaming
+        Read current aircraft data and yield records as they are built.
+
+        Avoids materializing the whole snapshot when the consumer can
+        stream records straight into the ingest client.
+
+        Args:
+            reuse_records: Recycle dicts from the snapshot pool. The
+                yielded records are then only valid until the
+                second-following pooled read - strictly for consumers
+                that serialize or copy each record immediately. Left
+                off, every record is a fresh dict the caller may keep.
+
+        Yields:
+            Aircraft records ready for streaming
         """
-        data = self._fetch_aircraft_data()
-        
-        now = datetime.now(timezone.utc)
-        timestamp = now.isoformat()
-        ts_epoch = int(now.timestamp())
+        data = await self._fetch_aircraft_data()
+
+        # Cheaper than datetime.now(timezone.utc) + isoformat() + timestamp():
+        # one clock read, one gmtime, one f-string
+        ts_epoch = int(time.time())
+        tm = time.gmtime(ts_epoch)
+        timestamp = (f"{tm.tm_year:04d}-{tm.tm_mon:02d}-{tm.tm_mday:02d}"
+                     f"T{tm.tm_hour:02d}:{tm.tm_min:02d}:{tm.tm_sec:02d}+00:00")
         
-        receiver_data = {
+        # Everything constant for this snapshot, merged into each row once
+        const = {
+            'datetimestamp': timestamp,
+            'ts': ts_epoch,
+            'hostname': self.hostname,
             'receiver_host': self.hostname,
             'receiver_ip': self.ip_address,
-            'receiver_mac': self.mac_address,
-            'receiver_time': data.get('now', time.time()),
-            'total_messages': data.get('messages', 0)
+            'receiver_time': data.now or time.time(),
+            'total_messages': data.messages
         }
-        
-        records = []
-        for ac in data.get('aircraft', []):
-            record = {
-                'uuid': f"adsb_{ac.get('hex', 'unknown')}_{ts_epoch}",
-                'rowid': f"{ts_epoch}_{uuid.uuid4()}",
-                'datetimestamp': timestamp,
-                'ts': ts_epoch,
-                
-                'icao_hex': ac.get('hex'),
-                'flight': ac.get('flight', '').strip() if ac.get('flight') else None,
-                'registration': ac.get('r'),
-                'aircraft_type': ac.get('t'),
-                'description': ac.get('desc'),
-                
-                'altitude_baro': ac.get('alt_baro'),
-                'altitude_geom': ac.get('alt_geom'),
-                'ground_speed': ac.get('gs'),
-                'track': ac.get('track'),
-                'true_heading': ac.get('true_heading'),
-                'mag_heading': ac.get('mag_heading'),
-                'indicated_airspeed': ac.get('ias'),
-                'true_airspeed': ac.get('tas'),
-                'mach': ac.get('mach'),
-                'vertical_rate': ac.get('baro_rate'),
-                'vertical_rate_geom': ac.get('geom_rate'),
-                
-                'latitude': ac.get('lat'),
-                'longitude': ac.get('lon'),
-                'nav_altitude': ac.get('nav_altitude_mcp'),
-                'nav_heading': ac.get('nav_heading'),
-                'nav_qnh': ac.get('nav_qnh'),
-                
-                'squawk': ac.get('squawk'),
-                'category': ac.get('category'),
-                'emergency': ac.get('emergency'),
-                
-                'rssi': ac.get('rssi'),
-                'messages': ac.get('messages'),
-                'seen': ac.get('seen'),
-                'seen_pos': ac.get('seen_pos'),
-                
-                'hostname': self.hostname,
-                'receiver_host': receiver_data['receiver_host'],
-                'receiver_ip': receiver_data['receiver_ip'],
-                'receiver_time': receiver_data['receiver_time'],
-                'total_messages': receiver_data['total_messages']
-            }
-            records.append(record)
-        
-        return records
+
+        # Reuse pooled dicts instead of allocating fresh ones per snapshot;
+        # pools alternate between pooled reads
+        aircraft = data.aircraft
+        if reuse_records:
+            pool = self._record_pools[self._pool_index]
+            self._pool_index ^= 1
+        else:
+            pool = None
+        stale_seen = self.stale_seen
+        emitted = 0
+        # Constant per snapshot; plain concatenation below beats re-parsing
+        # an f-string template per record
+        uuid_suffix = f"_{ts_epoch}"
+        rowid_prefix = f"{ts_epoch}_"
+        for ac in aircraft:
+            # Stale ghost: long since heard, no position, no callsign.
+            # Every row skipped here is network bytes and per-row Snowflake
+            # ingest work saved downstream.
+            if (stale_seen > 0
+                    and (ac.seen is None or ac.seen > stale_seen)
+                    and ac.lat is None
+                    and not ac.flight):
+                continue
+
+            if pool is None:
+                record = {}
+            elif emitted < len(pool):
+                record = pool[emitted]
+                record.clear()
+            else:
+                record = {}
+                pool.append(record)
+            emitted += 1
+            for k, v in _FIELD_MAP:
+                record[k] = getattr(ac, v)
+            record.update(const)
+            record['uuid'] = "adsb_" + (ac.hex or 'unknown') + uuid_suffix
+            record['rowid'] = rowid_prefix + secrets.token_hex(16)
+            record['flight'] = (ac.flight or '').strip() or None
+            yield record
+
+    async def read(self) -> List[Dict]:
+        """
+        Read current aircraft data and format for Snowflake ingestion.
+
+        Thin list-materializing wrapper over iter_read().
+
+        Returns:
+            List of aircraft records ready for streaming
+        """
+        return [record async for record in self.iter_read()]
+
+    @staticmethod
+    def encode_records(records) -> bytearray:
+        """
+        Serialize records to NDJSON bytes with orjson.
+
+        Serializing at the sensor means the ingest client POSTs the buffer
+        as-is instead of walking every dict a second time.
+        """
+        buf = bytearray()
+        for record in records:
+            buf += orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+        return buf
+
+    async def read_as_json_lines(self) -> bytearray:
+        """
+        Read current aircraft data pre-serialized as NDJSON bytes.
+
+        Returns:
+            NDJSON buffer, one aircraft record per line
+        """
+        buf = bytearray()
+        async for record in self.iter_read(reuse_records=True):
+            buf += orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+        return buf
     
-    def read_batch(self, count: int = 1, interval: float = 3.0, fast_mode: bool = False) -> List[Dict]:
+    async def iter_batch(self, count: int = 1, interval: float = 3.0, fast_mode: bool = False):
+        """
+        Yield each snapshot's records as it is captured.
+
+        Lets the caller start ingesting snapshot N while the sensor sleeps
+        before snapshot N+1 instead of accumulating everything first.
+
+        Args:
+            count: Number of snapshots to take
+            interval: Seconds between snapshots (minimum 3s recommended)
+            fast_mode: If True, use minimum interval
+
+        Yields:
+            List of aircraft records per snapshot
+        """
+        actual_interval = 0.5 if fast_mode else max(3.0, interval)
+
+        for i in range(count):
+            yield await self.read()
+
+            if i < count - 1:
+                await asyncio.sleep(actual_interval)
+
+    async def read_batch(self, count: int = 1, interval: float = 3.0, fast_mode: bool = False) -> List[Dict]:
         """
         Read multiple batches of aircraft data.
-        
+
         ADS-B data updates every ~3 seconds, so multiple reads capture temporal changes.
-        
+
         Args:
             count: Number of snapshots to take
             interval: Seconds between snapshots (minimum 3s recommended)
             fast_mode: If True, use minimum interval
-            
+
         Returns:
             List of all aircraft records from all snapshots
         """
         all_records = []
-        actual_interval = 0.5 if fast_mode else max(3.0, interval)
-        
-        for i in range(count):
-            records = self.read()
+
+        async for records in self.iter_batch(count, interval, fast_mode):
             all_records.extend(records)
-            
-            if i < count - 1:
-                time.sleep(actual_interval)
-        
-        logger.info(f"Read {len(all_records)} aircraft records from {count} snapshots")
+
+        logger.info("Read %d aircraft records from %d snapshots", len(all_records), count)
         return all_records
-    
-    def get_summary(self) -> Dict:
+
+    async def get_summary(self) -> Dict:
         """Get summary statistics of current aircraft."""
-        data = self._fetch_aircraft_data()
-        aircraft = data.get('aircraft', [])
-        
+        data = await self._fetch_aircraft_data()
+        aircraft = data.aircraft
+
         if not aircraft:
             return {
                 'total_aircraft': 0,
                 'with_position': 0,
                 'with_altitude': 0,
                 'avg_altitude': 0,
-                'total_messages': data.get('messages', 0)
+                'total_messages': data.messages
             }
-        
-        with_pos = sum(1 for ac in aircraft if ac.get('lat') and ac.get('lon'))
-        with_alt = [ac.get('alt_baro', 0) for ac in aircraft if ac.get('alt_baro')]
-        
+
+        with_pos = sum(1 for ac in aircraft if ac.lat and ac.lon)
+        # alt_baro is the string "ground" for surface traffic; skip those
+        with_alt = [ac.alt_baro for ac in aircraft if isinstance(ac.alt_baro, (int, float))]
+
         return {
             'total_aircraft': len(aircraft),
             'with_position': with_pos,
             'with_altitude': len(with_alt),
             'avg_altitude': sum(with_alt) / len(with_alt) if with_alt else 0,
-            'total_messages': data.get('messages', 0)
+            'total_messages': data.messages
         }
     
-    def cleanup(self):
+    async def cleanup(self):
         """Cleanup resources."""
         self._running = False
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
         logger.info("ADS-B sensor cleaned up")
 
 
-def main():
+async def main():
     """Test the ADS-B sensor."""
     logging.basicConfig(level=logging.INFO)
-    
+
     sensor = ADSBSensor(simulate=True)
-    
+    await sensor.connect()
+
     print("\n=== ADS-B Sensor Test ===\n")
-    
-    summary = sensor.get_summary()
+
+    summary = await sensor.get_summary()
     print(f"Summary: {json.dumps(summary, indent=2)}")
-    
-    records = sensor.read()
+
+    records = await sensor.read()
     print(f"\nGot {len(records)} aircraft records")
-    
+
     if records:
         print(f"\nSample record:")
         print(json.dumps(records[0], indent=2, default=str))
-    
-    sensor.cleanup()
+
+    await sensor.cleanup()
 
 
 if __name__ == '__main__':
-    main()
+    asyncio.run(main())
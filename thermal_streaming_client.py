@@ -21,14 +21,22 @@ Based on Snowflake's Snowpipe Streaming v2 REST API:
 https://docs.snowflake.com/user-guide/snowpipe-streaming/snowpipe-streaming-high-performance-rest-api
 """
 
+import asyncio
+import atexit
+import fcntl
+import gzip
+import hashlib
 import json
 import logging
+import threading
 import time
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Dict, Optional, List
-import requests
+from typing import Dict, Iterable, Optional, List, Union
+import httpx
+import orjson
 from pathlib import Path
 
 # Add current directory to path for imports
@@ -37,6 +45,10 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 # Import JWT authentication module
 from snowflake_jwt_auth import SnowflakeJWTAuth
 
+# NDJSON row encoding: handle datetime (as naive UTC) and numpy scalars
+# natively in C instead of failing over to Python-level default= hooks
+_ORJSON_OPTS = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -76,56 +88,249 @@ class SnowpipeStreamingClient:
         
         self.config = self._load_config(config_file)
         self.jwt_auth = SnowflakeJWTAuth(self.config)
+
+        # One pooled HTTP/2 client for every REST call: keep-alive reuses
+        # the TCP/TLS connection to the ingest host across consecutive
+        # appends, and multiplexed frames + HPACK header compression cut
+        # the per-request overhead on the hot POST path
+        self._http = httpx.Client(
+            http2=True,
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=8),
+            transport=httpx.HTTPTransport(retries=3),
+            headers={'Content-Type': 'application/json'}
+        )
+
+        # Async twin of the client above for callers already running an
+        # event loop: while an append awaits the server, the sensor
+        # collector keeps producing on the same loop. Built lazily by
+        # _aclient() so sync-only callers (and MultiChannelClient's
+        # sub-clients) never hold an AsyncClient they'd have to aclose()
+        self._ahttp: Optional[httpx.AsyncClient] = None
         
         # Streaming state
         self.control_host = None
         self.ingest_host = None
         # Use unique channel name with timestamp to avoid stale token conflicts
         base_channel = self.config.get('channel_name', 'TH_CHNL')
-        import datetime
-        timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         self.channel_name = f"{base_channel}_{timestamp}"
         self.continuation_token = None
         self.offset_token = 0
+        # Highest offset the server has reported as durably committed;
+        # appends and status polls both advance it
+        self._last_known_committed = 0
         self.scoped_token = None
         self.token_expiry = None
+        # Monotonic refresh deadline (NTP-step proof); token_expiry stays
+        # wall-clock because the disk cache is shared across processes
+        self._token_deadline = 0.0
+        # Serializes token refresh when appends run on several threads
+        self._token_lock = threading.Lock()
+        # A channel is a single ordered commit stream: the offset and
+        # continuation token must not be read by one append while another
+        # is still in flight, or Snowpipe's offset dedupe silently drops
+        # the second batch. One lock per path serializes prepare->send->
+        # finish; the asyncio lock is created lazily on the running loop
+        self._append_lock = threading.Lock()
+        self._append_alock: Optional[asyncio.Lock] = None
+        # Scoped tokens survive process restarts here so short-lived runs
+        # skip the JWT -> scoped-token auth round-trip on cold start. The
+        # file is keyed by account/user/role so clients pointed at
+        # different accounts (or run as different Snowflake users) never
+        # read each other's tokens
+        ident = ':'.join((self.config.get('account', ''),
+                          self.config.get('user', ''),
+                          self.config.get('role', 'PUBLIC'))).upper()
+        digest = hashlib.sha256(ident.encode()).hexdigest()[:16]
+        self._token_cache_path = Path(
+            f'~/.snowpipe_token_cache_{digest}').expanduser()
+
+        # URL templates are compiled once here from the config-derived
+        # path segments; only the ingest host (and channel, which can be
+        # reassigned before initialize) are left as placeholders for
+        # _build_urls() to fill in after discovery
+        db = self.config['database']
+        schema = self.config['schema']
+        # Get pipe name - for Snowpipe Streaming v2, we need the PIPE not the table
+        pipe = self.config.get('pipe', self.config.get('table'))
+        pipe_path = f"databases/{db}/schemas/{schema}/pipes/{pipe}"
+        self._url_tmpls = {
+            'open': f"https://{{ingest}}/v2/streaming/{pipe_path}/channels/{{channel}}",
+            'append': f"https://{{ingest}}/v2/streaming/data/{pipe_path}/channels/{{channel}}/rows",
+            'status': f"https://{{ingest}}/v2/streaming/{pipe_path}:bulk-channel-status",
+        }
+
+        # Finalized endpoint URLs, filled in by _build_urls() once the
+        # ingest host is discovered
+        self._open_channel_url = None
+        self._append_url = None
+        self._status_url = None
+        self._append_params = {'continuationToken': None, 'offsetToken': None}
+        self._ndjson_headers = {'Content-Type': 'application/x-ndjson'}
+        self._ndjson_gzip_headers = {**self._ndjson_headers,
+                                     'Content-Encoding': 'gzip'}
+
+        # Gzip larger NDJSON bodies unless the pipe's config opts out
+        # (e.g. if the account rejects Content-Encoding: gzip)
+        self._compress = bool(self.config.get('compress', True))
+
+        # insert_rows coalesces small calls into one POST; a buffered batch
+        # goes out when either threshold fires, on flush(), or at exit
+        self.batch_max_rows = int(self.config.get('batch_max_rows', 500))
+        self.batch_max_interval = float(self.config.get('batch_max_interval_s', 2.0))
+        self._pending: List[Dict] = []
+        self._last_flush = time.monotonic()
+        atexit.register(self._flush_at_exit)
         
-        # Statistics
+        # Statistics; elapsed-time math uses the monotonic clock so NTP
+        # steps (common right after a Pi boots) can't skew throughput
+        # numbers, with wall_start kept for human-readable logs
         self.stats = {
             'total_rows_sent': 0,
             'total_batches': 0,
             'total_bytes_sent': 0,
             'errors': 0,
-            'start_time': time.time()
+            'start_time': time.monotonic(),
+            'wall_start': time.time()
         }
         
         logger.info("SnowpipeStreamingClient initialized")
-        logger.info(f"Database: {self.config['database']}")
-        logger.info(f"Schema: {self.config['schema']}")
-        logger.info(f"Table: {self.config.get('table', self.config.get('pipe', 'N/A'))}")
-        logger.info(f"Channel: {self.channel_name}")
+        logger.info("Database: %s", self.config['database'])
+        logger.info("Schema: %s", self.config['schema'])
+        logger.info("Table: %s", self.config.get('table', self.config.get('pipe', 'N/A')))
+        logger.info("Channel: %s", self.channel_name)
     
     def _load_config(self, config_file: str) -> Dict:
         """Load configuration from JSON file."""
         try:
             with open(config_file, 'r') as f:
                 config = json.load(f)
-            logger.info(f"Loaded configuration from {config_file}")
+            logger.info("Loaded configuration from %s", config_file)
             return config
         except FileNotFoundError:
-            logger.error(f"Configuration file {config_file} not found")
+            logger.error("Configuration file %s not found", config_file)
             raise
         except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON in configuration file: {e}")
+            logger.error("Invalid JSON in configuration file: %s", e)
             raise
     
+    @staticmethod
+    def _parse(resp) -> Dict:
+        """Parse a JSON response body from its raw bytes.
+
+        orjson.loads(resp.content) skips the UTF-8 str decode that
+        resp.json() would perform before parsing.
+        """
+        return orjson.loads(resp.content)
+
+    def _load_cached_token(self):
+        """Load a scoped token persisted by a previous run, if still valid."""
+        try:
+            with open(self._token_cache_path, 'r') as f:
+                fcntl.flock(f, fcntl.LOCK_SH)
+                try:
+                    cached = json.load(f)
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+            # Leave a 60s margin so we never hand out an almost-dead token
+            if cached.get('token_expiry', 0) > time.time() + 60:
+                return cached['scoped_token'], cached['token_expiry']
+        except (OSError, ValueError, KeyError):
+            pass
+        return None, None
+
+    def _store_cached_token(self):
+        """Atomically persist the scoped token (mode 0600) for reuse."""
+        tmp_path = f"{self._token_cache_path}.tmp"
+        try:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    json.dump({'scoped_token': self.scoped_token,
+                               'token_expiry': self.token_expiry}, f)
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+            os.replace(tmp_path, self._token_cache_path)
+        except OSError as e:
+            logger.debug("Could not persist token cache: %s", e)
+
+    def _aclient(self) -> 'httpx.AsyncClient':
+        """Return the async HTTP client, constructing it on first use."""
+        if self._ahttp is None:
+            self._ahttp = httpx.AsyncClient(
+                http2=True,
+                timeout=30.0,
+                limits=httpx.Limits(max_keepalive_connections=8),
+                transport=httpx.AsyncHTTPTransport(retries=3),
+                headers={'Content-Type': 'application/json'}
+            )
+            # Catch up on a token minted before the async client existed
+            if self.scoped_token is not None:
+                self._ahttp.headers['Authorization'] = f'Bearer {self.scoped_token}'
+        return self._ahttp
+
+    def _set_auth_header(self):
+        """Propagate the current scoped token to both HTTP clients."""
+        self._http.headers['Authorization'] = f'Bearer {self.scoped_token}'
+        if self._ahttp is not None:
+            self._ahttp.headers['Authorization'] = f'Bearer {self.scoped_token}'
+
+    def _invalidate_token(self):
+        """Drop the current scoped token and its disk cache.
+
+        Called when the server rejects a request with 401/403: the token
+        may have been revoked server-side before its local deadline, so
+        the next _ensure_valid_token() must go back to the JWT auth flow
+        instead of re-serving the same dead token (from memory or disk).
+        """
+        with self._token_lock:
+            self.scoped_token = None
+            self.token_expiry = None
+            self._token_deadline = 0.0
+            try:
+                self._token_cache_path.unlink()
+            except OSError:
+                pass
+
+    def _token_fresh(self) -> bool:
+        """True while the current scoped token is safely within its lifetime."""
+        return self.scoped_token is not None and time.monotonic() < self._token_deadline
+
     def _ensure_valid_token(self):
-        """Ensure we have a valid scoped token."""
-        if self.scoped_token is None or (self.token_expiry and time.time() >= self.token_expiry):
+        """Ensure we have a valid scoped token (single-flight under threads)."""
+        # Double-checked: the unlocked fast path costs one monotonic read
+        # per append; only threads that see an expired token contend on
+        # the lock, and the re-check inside means exactly one refreshes
+        # instead of N parallel RSA signings on token expiry
+        if self._token_fresh():
+            return
+
+        with self._token_lock:
+            if self._token_fresh():
+                return
+
+            # Cold start: reuse a token cached on disk by a previous run
+            if self.scoped_token is None:
+                token, expiry = self._load_cached_token()
+                if token:
+                    self.scoped_token = token
+                    self.token_expiry = expiry
+                    self._token_deadline = time.monotonic() + (expiry - time.time())
+                    self._set_auth_header()
+                    logger.info("Reusing cached scoped token")
+                    return
+
             logger.info("Obtaining new scoped token...")
             self.scoped_token = self.jwt_auth.get_scoped_token()
             # Tokens typically valid for 1 hour, refresh after 50 minutes
             self.token_expiry = time.time() + 3000
+            self._token_deadline = time.monotonic() + 3000
+            # Headers are updated inside the lock so no request can ever
+            # see a half-updated token
+            self._set_auth_header()
+            self._store_cached_token()
             logger.info("New scoped token obtained")
     
     def discover_ingest_host(self) -> str:
@@ -144,24 +349,19 @@ class SnowpipeStreamingClient:
         url = f"{self.control_host}/v2/streaming/hostname"
         
         self._ensure_valid_token()
-        
-        headers = {
-            'Authorization': f'Bearer {self.scoped_token}',
-            'Content-Type': 'application/json'
-        }
-        
+
         try:
             # Use GET method for hostname endpoint
-            response = requests.get(url, headers=headers, timeout=30)
+            response = self._http.get(url)
             response.raise_for_status()
             
-            logger.debug(f"Response status: {response.status_code}")
-            logger.debug(f"Response headers: {response.headers}")
-            logger.debug(f"Response body: {response.text}")
+            logger.debug("Response status: %s", response.status_code)
+            logger.debug("Response headers: %s", response.headers)
+            logger.debug("Response body: %s", response.text)
             
             # Check if response is text (hostname) or JSON
             if response.headers.get('Content-Type', '').startswith('application/json'):
-                data = response.json()
+                data = self._parse(response)
                 self.ingest_host = data.get('hostname') or data.get('ingest_host')
             else:
                 # Response might be plain text with just the hostname
@@ -170,67 +370,72 @@ class SnowpipeStreamingClient:
             if not self.ingest_host:
                 raise ValueError("No hostname returned from endpoint")
             
-            logger.info(f"Ingest host discovered: {self.ingest_host}")
+            logger.info("Ingest host discovered: %s", self.ingest_host)
+            self._build_urls()
             return self.ingest_host
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             # Try to use response text directly as hostname
-            logger.debug(f"Response is not JSON, using as plain text: {response.text}")
+            logger.debug("Response is not JSON, using as plain text: %s", response.text)
             self.ingest_host = response.text.strip()
             if self.ingest_host:
-                logger.info(f"Ingest host discovered (plain text): {self.ingest_host}")
+                logger.info("Ingest host discovered (plain text): %s", self.ingest_host)
+                self._build_urls()
                 return self.ingest_host
             else:
-                logger.error(f"Empty response from hostname endpoint")
+                logger.error("Empty response from hostname endpoint")
                 raise ValueError("Empty response from hostname endpoint")
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to discover ingest host: {e}")
-            if hasattr(e, 'response') and e.response is not None:
-                logger.error(f"Response status: {e.response.status_code}")
-                logger.error(f"Response body: {e.response.text}")
+        except httpx.HTTPError as e:
+            logger.error("Failed to discover ingest host: %s", e)
+            if isinstance(e, httpx.HTTPStatusError):
+                if e.response.status_code in (401, 403):
+                    self._invalidate_token()
+                logger.error("Response status: %s", e.response.status_code)
+                logger.error("Response body: %s", e.response.text)
             raise
     
+    def _build_urls(self):
+        """
+        Finalize the precompiled URL templates into concrete endpoint URLs.
+
+        Run once after ingest-host discovery; each call thereafter uses the
+        finished string, keeping all path assembly off the per-append path.
+        """
+        subs = {'ingest': self.ingest_host, 'channel': self.channel_name}
+        self._open_channel_url = self._url_tmpls['open'].format_map(subs)
+        self._append_url = self._url_tmpls['append'].format_map(subs)
+        self._status_url = self._url_tmpls['status'].format_map(subs)
+
     def open_channel(self) -> Dict:
         """
         Open a streaming channel.
         Step 3 in the REST API tutorial.
         """
-        logger.info(f"Opening channel: {self.channel_name}")
+        logger.info("Opening channel: %s", self.channel_name)
         
         if not self.ingest_host:
             self.discover_ingest_host()
         
         self._ensure_valid_token()
         
-        db = self.config['database']
-        schema = self.config['schema']
-        # Get pipe name - for Snowpipe Streaming v2, we need the PIPE not the table
-        pipe = self.config.get('pipe', self.config.get('table'))
-        
         # Open channel endpoint - uses PIPES not TABLES
         # https://docs.snowflake.com/en/user-guide/snowpipe-streaming/snowpipe-streaming-high-performance-error-handling
-        url = (
-            f"https://{self.ingest_host}/v2/streaming"
-            f"/databases/{db}/schemas/{schema}/pipes/{pipe}/channels/{self.channel_name}"
-        )
-        
-        headers = {
-            'Authorization': f'Bearer {self.scoped_token}',
-            'Content-Type': 'application/json'
-        }
+        url = self._open_channel_url
         
         # Empty payload as per official docs
         payload = {}
-        
+
         try:
             # Use PUT method with empty body
-            response = requests.put(url, headers=headers, json=payload, timeout=30)
+            response = self._http.put(url, json=payload)
             response.raise_for_status()
             
-            data = response.json()
+            data = self._parse(response)
             
-            # Debug: Log full response
-            logger.debug(f"Open channel response: {json.dumps(data, indent=2)}")
+            # Debug: Log full response; pretty-printing is only worth the
+            # CPU when debug logging is actually on
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Open channel response: %s", json.dumps(data, indent=2))
             
             # Extract tokens
             self.continuation_token = data.get('next_continuation_token')
@@ -241,246 +446,680 @@ class SnowpipeStreamingClient:
             if self.offset_token is None:
                 self.offset_token = 0
             
-            logger.info(f"Channel opened successfully")
-            logger.info(f"Continuation token: {self.continuation_token}")
-            logger.info(f"Initial offset token: {self.offset_token}")
+            logger.info("Channel opened successfully")
+            logger.info("Continuation token: %s", self.continuation_token)
+            logger.info("Initial offset token: %s", self.offset_token)
             
             if not self.continuation_token:
                 logger.warning("No continuation token received! This may cause issues.")
             
             return data
             
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to open channel: {e}")
-            if hasattr(e, 'response') and e.response is not None:
-                logger.error(f"Response status: {e.response.status_code}")
-                logger.error(f"Response text: {e.response.text}")
+        except httpx.HTTPError as e:
+            logger.error("Failed to open channel: %s", e)
+            if isinstance(e, httpx.HTTPStatusError):
+                if e.response.status_code in (401, 403):
+                    self._invalidate_token()
+                logger.error("Response status: %s", e.response.status_code)
+                logger.error("Response text: %s", e.response.text)
             raise
     
-    def insert_rows(self, rows: List[Dict]) -> int:
+    def insert_rows(self, rows: Union[Iterable[Dict], Dict[str, List]]) -> int:
         """
-        Insert rows to the streaming channel (alias for append_rows).
-        
+        Queue rows for ingest, coalescing small calls into larger POSTs.
+
+        Rows accumulate until batch_max_rows are pending or
+        batch_max_interval seconds have passed since the last flush, which
+        amortizes the HTTP and commit overhead when the producer emits a
+        few rows at a time. Use flush() to force the buffer out, or
+        append_rows()/insert_rows_raw() to bypass batching entirely.
+
         Args:
-            rows: List of dictionaries representing the data rows
-            
+            rows: Iterable of row dictionaries, or a dict of equal-length
+                  columns (zipped into rows on demand)
+
         Returns:
-            Number of rows inserted
+            Number of rows sent by this call (0 while still buffering)
         """
-        if not rows:
-            logger.warning("No rows to insert")
+        self._pending.extend(self._iter_rows(rows))
+
+        if (len(self._pending) >= self.batch_max_rows
+                or time.monotonic() - self._last_flush > self.batch_max_interval):
+            return self.flush()
+        return 0
+
+    def flush(self) -> int:
+        """
+        Send any rows buffered by insert_rows immediately.
+
+        Returns:
+            Number of rows sent
+        """
+        if not self._pending:
+            self._last_flush = time.monotonic()
             return 0
-        
-        # Call append_rows
-        self.append_rows(rows)
-        return len(rows)
+
+        pending, self._pending = self._pending, []
+        sent_before = self.stats['total_rows_sent']
+        try:
+            self.append_rows(pending)
+        except Exception:
+            # Put the batch back at the front so nothing buffered is lost;
+            # a later insert_rows/flush (or the atexit hook) retries it
+            self._pending[:0] = pending
+            raise
+        finally:
+            self._last_flush = time.monotonic()
+        return self.stats['total_rows_sent'] - sent_before
+
+    def _flush_at_exit(self):
+        """atexit hook: best-effort flush so buffered rows aren't dropped."""
+        if self._pending and self.continuation_token:
+            row_count = len(self._pending)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning("Could not flush %s pending rows at exit: %s", row_count, e)
+
+    async def insert_rows_async(self, rows: Iterable[Dict]) -> int:
+        """
+        Async counterpart of insert_rows.
+
+        Awaits the POST on the event loop so callers can pipeline ingest
+        with other event-loop work (e.g. the next sensor read).
+        """
+        sent_before = self.stats['total_rows_sent']
+        await self.append_rows_async(rows)
+        return self.stats['total_rows_sent'] - sent_before
     
-    def append_rows(self, rows: List[Dict]) -> Dict:
+    def append_rows(self, rows: Iterable[Dict]) -> Dict:
         """
         Append rows to the streaming channel.
         Step 4 in the REST API tutorial.
-        
+
         Args:
-            rows: List of dictionaries representing the data rows
-            
+            rows: Iterable of row dictionaries (generators are serialized
+                  record-by-record without being materialized first), or a
+                  dict of equal-length columns
+
         Returns:
             Response dictionary from the API
         """
-        if not rows:
+        buf, row_count = self._encode_ndjson(rows)
+
+        if row_count == 0:
             logger.warning("No rows to append")
             return {}
-        
-        logger.info(f"Appending {len(rows)} rows...")
-        
+
+        return self._post_rows(buf, row_count)
+
+    async def append_rows_async(self, rows: Iterable[Dict]) -> Dict:
+        """
+        Async counterpart of append_rows.
+
+        Serialization stays on the loop (it is CPU-cheap); the POST itself
+        is awaited, freeing the loop for other tasks. Appends on this
+        channel are serialized behind a per-channel lock - overlap comes
+        from other event-loop work or additional channels, never from two
+        in-flight POSTs on one commit stream.
+        """
+        buf, row_count = self._encode_ndjson(rows)
+
+        if row_count == 0:
+            logger.warning("No rows to append")
+            return {}
+
+        return await self._apost_rows(buf, row_count)
+
+    def insert_rows_raw(self, ndjson_data) -> int:
+        """
+        POST a pre-serialized NDJSON payload (one JSON object per line).
+
+        Skips the client-side serialization pass entirely for producers
+        that already encode their rows (see ADSBSensor.read_as_json_lines).
+
+        Args:
+            ndjson_data: NDJSON payload as bytes/bytearray
+
+        Returns:
+            Number of rows sent
+        """
+        if not ndjson_data:
+            logger.warning("No rows to insert")
+            return 0
+
+        row_count = ndjson_data.count(b'\n')
+        if not ndjson_data.endswith(b'\n'):
+            row_count += 1
+
+        self._post_rows(ndjson_data, row_count)
+        return row_count
+
+    async def insert_rows_raw_async(self, ndjson_data) -> int:
+        """Async counterpart of insert_rows_raw for event-loop callers."""
+        if not ndjson_data:
+            logger.warning("No rows to insert")
+            return 0
+
+        row_count = ndjson_data.count(b'\n')
+        if not ndjson_data.endswith(b'\n'):
+            row_count += 1
+
+        await self._apost_rows(ndjson_data, row_count)
+        return row_count
+
+    @staticmethod
+    def _iter_rows(rows):
+        """
+        Yield row dicts from either row-major or columnar input.
+
+        Columnar input is a single dict mapping column name to an
+        equal-length sequence of values (the layout numpy pipelines
+        produce); rows are zipped together lazily, one at a time.
+        """
+        if isinstance(rows, dict):
+            keys = tuple(rows.keys())
+            for values in zip(*rows.values()):
+                yield dict(zip(keys, values))
+        else:
+            yield from rows
+
+    @classmethod
+    def _encode_ndjson(cls, rows: Union[Iterable[Dict], Dict[str, List]]):
+        """
+        Encode rows into one NDJSON buffer in a single linear pass.
+
+        Appending each orjson-encoded row into a growing bytearray avoids
+        the intermediate list + join copy of the per-row approach, and
+        counts rows in the same pass so generator input never has to be
+        materialized first. Accepts row dicts or a dict of columns (see
+        _iter_rows). No trailing newline.
+
+        Returns:
+            (buf, row_count) where buf is a bytearray
+        """
+        buf = bytearray()
+        row_count = 0
+        for row in cls._iter_rows(rows):
+            if row_count:
+                buf += b'\n'
+            buf += orjson.dumps(row, option=_ORJSON_OPTS)
+            row_count += 1
+        return buf, row_count
+
+    def _prepare_append(self, ndjson_data):
+        """
+        Build one rows-endpoint request (shared by the sync and async paths).
+
+        Returns (url, params, headers, body, new_offset); tokens and stats
+        are only updated once the response comes back in _finish_append.
+        """
         if not self.ingest_host or not self.continuation_token:
             raise RuntimeError("Channel not opened. Call open_channel() first.")
-        
-        self._ensure_valid_token()
-        
+
         # Increment offset for this batch
         new_offset = self.offset_token + 1
-        
-        db = self.config['database']
-        schema = self.config['schema']
-        # Get pipe name - for Snowpipe Streaming v2, we need the PIPE not the table
-        pipe = self.config.get('pipe', self.config.get('table'))
-        
-        # Build URL with query parameters - uses PIPES not TABLES
-        url = (
-            f"https://{self.ingest_host}/v2/streaming/data"
-            f"/databases/{db}/schemas/{schema}/pipes/{pipe}/channels/{self.channel_name}/rows"
-        )
-        
-        # Add query parameters
-        params = {
-            'continuationToken': self.continuation_token,
-            'offsetToken': str(new_offset)
-        }
-        
-        logger.debug(f"Append URL: {url}")
-        logger.debug(f"Params: {params}")
-        
-        headers = {
-            'Authorization': f'Bearer {self.scoped_token}',
-            'Content-Type': 'application/x-ndjson'
-        }
-        
-        # Convert rows to NDJSON format
-        ndjson_data = '\n'.join(json.dumps(row) for row in rows)
-        
+
+        # URL is precomputed by _build_urls(); only the tokens vary per
+        # call, written into the one reused params dict
+        url = self._append_url
+        params = self._append_params
+        params['continuationToken'] = self.continuation_token
+        params['offsetToken'] = str(new_offset)
+
+        logger.debug("Append URL: %s", url)
+        logger.debug("Params: %s", params)
+
+        # Client carries auth; only the NDJSON content type is per-call
+        headers = self._ndjson_headers
+
+        # Level-1 gzip is cheap on ARM and typically shrinks the repetitive
+        # NDJSON keys 6-7x; only worth the header overhead on larger bodies.
+        # gzip reads the bytearray through the buffer protocol, so the
+        # accumulator is never duplicated before compression
+        if self._compress and len(ndjson_data) > 16384:
+            ndjson_data = gzip.compress(ndjson_data, 1)
+            headers = self._ndjson_gzip_headers
+        elif isinstance(ndjson_data, bytearray):
+            # httpx only streams bytes bodies; this is the payload's one
+            # and only materialization on the uncompressed path
+            ndjson_data = bytes(ndjson_data)
+
+        return url, params, headers, ndjson_data, new_offset
+
+    @staticmethod
+    def _read_error_snippet(response, limit: int = 4096) -> str:
+        """Read at most `limit` bytes of a streamed error body, then close."""
+        snippet = bytearray()
         try:
-            response = requests.post(
-                url,
-                params=params,
-                headers=headers,
-                data=ndjson_data.encode('utf-8'),
-                timeout=30
-            )
-            
-            # Log response details if error
-            if response.status_code >= 400:
-                logger.error(f"Append failed with status {response.status_code}")
-                logger.error(f"Response: {response.text}")
-            
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Update tokens for next append
-            self.continuation_token = data.get('next_continuation_token')
-            
-            # Update offset token only after successful append
-            self.offset_token = new_offset
-            
-            # Update statistics
-            self.stats['total_rows_sent'] += len(rows)
-            self.stats['total_batches'] += 1
-            self.stats['total_bytes_sent'] += len(ndjson_data)
-            
-            logger.info(f"Successfully appended {len(rows)} rows")
-            logger.debug(f"New offset token: {self.offset_token}")
-            
-            return data
-            
-        except requests.exceptions.RequestException as e:
-            self.stats['errors'] += 1
-            logger.error(f"Failed to append rows: {e}")
-            if hasattr(e.response, 'text'):
-                logger.error(f"Response: {e.response.text}")
-            raise
+            for chunk in response.iter_bytes():
+                snippet += chunk
+                if len(snippet) >= limit:
+                    break
+        finally:
+            response.close()
+        return bytes(snippet[:limit]).decode('utf-8', 'replace')
+
+    @staticmethod
+    async def _aread_error_snippet(response, limit: int = 4096) -> str:
+        """Async variant of _read_error_snippet."""
+        snippet = bytearray()
+        try:
+            async for chunk in response.aiter_bytes():
+                snippet += chunk
+                if len(snippet) >= limit:
+                    break
+        finally:
+            await response.aclose()
+        return bytes(snippet[:limit]).decode('utf-8', 'replace')
+
+    def _finish_append(self, response, row_count: int, new_offset: int, body_len: int) -> Dict:
+        """Validate a streamed append response and advance tokens/statistics."""
+        # Error bodies can be large; log only a bounded snippet instead of
+        # buffering the whole thing on the Pi
+        if response.status_code >= 400:
+            logger.error("Append failed with status %s", response.status_code)
+            logger.error("Response: %s", self._read_error_snippet(response))
+
+        response.raise_for_status()
+
+        # Success bodies are tiny (tokens + status); read them fully now
+        response.read()
+        response.close()
+        data = self._parse(response)
+        return self._record_append_success(data, row_count, new_offset, body_len)
+
+    def _record_append_success(self, data: Dict, row_count: int, new_offset: int,
+                               body_len: int) -> Dict:
+        """Advance tokens and statistics after a successful append."""
+        # Update tokens for next append
+        self.continuation_token = data.get('next_continuation_token')
+
+        # Update offset token only after successful append
+        self.offset_token = new_offset
+
+        # Many pipes echo the committed offset in the append response;
+        # remember it so wait_for_commit can skip status polls entirely
+        committed = data.get('channel_status', {}).get('last_committed_offset_token')
+        if committed is not None:
+            self._last_known_committed = int(committed)
+
+        # Update statistics
+        self.stats['total_rows_sent'] += row_count
+        self.stats['total_batches'] += 1
+        self.stats['total_bytes_sent'] += body_len
+
+        logger.info("Successfully appended %s rows", row_count)
+        logger.debug("New offset token: %s", self.offset_token)
+
+        return data
+
+    async def _afinish_append(self, response, row_count: int, new_offset: int,
+                              body_len: int) -> Dict:
+        """Async variant of _finish_append for streamed responses."""
+        if response.status_code >= 400:
+            logger.error("Append failed with status %s", response.status_code)
+            logger.error("Response: %s", await self._aread_error_snippet(response))
+
+        response.raise_for_status()
+
+        await response.aread()
+        await response.aclose()
+        data = self._parse(response)
+        return self._record_append_success(data, row_count, new_offset, body_len)
+
+    def _post_rows(self, ndjson_data, row_count: int) -> Dict:
+        """Send an NDJSON payload to the channel's rows endpoint.
+
+        Appends on one channel are serialized: the offset read in
+        _prepare_append and the advance in _record_append_success must be
+        atomic per POST or overlapping calls replay the same offset and
+        Snowpipe silently dedupes one of them away.
+        """
+        logger.info("Appending %s rows...", row_count)
+
+        with self._append_lock:
+            url, params, headers, body, new_offset = self._prepare_append(ndjson_data)
+
+            # Bounded retry replaying the SAME continuation/offset tokens:
+            # Snowpipe dedupes by offset, so a request that actually landed
+            # before the connection dropped is a no-op on replay. Only
+            # transport errors, 5xx and auth rejections (401/403, which
+            # invalidate the token so the next attempt refreshes it) are
+            # retried; other 4xx mean the request itself is wrong and fail
+            # immediately.
+            for attempt in range(3):
+                try:
+                    # Inside the loop so a retry after an auth rejection
+                    # picks up a freshly minted token
+                    self._ensure_valid_token()
+                    # Stream the response: the body is only read after the status
+                    # check, so error paths never buffer more than a snippet
+                    request = self._http.build_request(
+                        'POST', url, params=params, headers=headers, content=body
+                    )
+                    response = self._http.send(request, stream=True)
+                    return self._finish_append(response, row_count, new_offset, len(body))
+
+                except httpx.HTTPError as e:
+                    if (isinstance(e, httpx.HTTPStatusError)
+                            and e.response.status_code in (401, 403)):
+                        self._invalidate_token()
+                        retryable = True
+                    else:
+                        retryable = (not isinstance(e, httpx.HTTPStatusError)
+                                     or e.response.status_code >= 500)
+                    if not retryable or attempt == 2:
+                        self.stats['errors'] += 1
+                        logger.error("Failed to append rows: %s", e)
+                        raise
+                    logger.warning("Append attempt %d/3 failed (%s); replaying offset %s",
+                                   attempt + 1, e, new_offset)
+                    time.sleep(0.2 * 2 ** attempt)
+
+    async def _apost_rows(self, ndjson_data, row_count: int) -> Dict:
+        """Async variant of _post_rows; same per-channel serialization.
+
+        Concurrent callers queue FIFO on the channel lock, so batches go
+        out in submission order while the event loop stays free for other
+        tasks (sensor reads, a different channel's append).
+        """
+        logger.info("Appending %s rows...", row_count)
+
+        # Created here rather than in __init__ so the lock binds to the
+        # running loop even on Python 3.9
+        if self._append_alock is None:
+            self._append_alock = asyncio.Lock()
+
+        async with self._append_alock:
+            ahttp = self._aclient()
+            url, params, headers, body, new_offset = self._prepare_append(ndjson_data)
+
+            # Same bounded same-offset replay as the sync path
+            for attempt in range(3):
+                try:
+                    # Token refresh does a blocking auth round-trip; keep
+                    # it off the loop. Inside the loop so a retry after an
+                    # auth rejection picks up a freshly minted token
+                    await asyncio.to_thread(self._ensure_valid_token)
+                    request = ahttp.build_request(
+                        'POST', url, params=params, headers=headers, content=body
+                    )
+                    response = await ahttp.send(request, stream=True)
+                    return await self._afinish_append(response, row_count, new_offset, len(body))
+
+                except httpx.HTTPError as e:
+                    if (isinstance(e, httpx.HTTPStatusError)
+                            and e.response.status_code in (401, 403)):
+                        self._invalidate_token()
+                        retryable = True
+                    else:
+                        retryable = (not isinstance(e, httpx.HTTPStatusError)
+                                     or e.response.status_code >= 500)
+                    if not retryable or attempt == 2:
+                        self.stats['errors'] += 1
+                        logger.error("Failed to append rows: %s", e)
+                        raise
+                    logger.warning("Append attempt %d/3 failed (%s); replaying offset %s",
+                                   attempt + 1, e, new_offset)
+                    await asyncio.sleep(0.2 * 2 ** attempt)
     
     def get_channel_status(self) -> Dict:
         """
         Get the current status of the channel.
         Step 4.4 in the REST API tutorial - Critical for verifying data persistence.
         """
-        logger.debug(f"Getting channel status: {self.channel_name}")
+        logger.debug("Getting channel status: %s", self.channel_name)
         
         if not self.ingest_host:
             raise RuntimeError("Ingest host not discovered. Call discover_ingest_host() first.")
         
         self._ensure_valid_token()
         
-        db = self.config['database']
-        schema = self.config['schema']
-        # Get pipe name - for Snowpipe Streaming v2, we need the PIPE not the table
-        pipe = self.config.get('pipe', self.config.get('table'))
-        
-        url = (
-            f"https://{self.ingest_host}/v2/streaming"
-            f"/databases/{db}/schemas/{schema}/pipes/{pipe}:bulk-channel-status"
-        )
-        
-        headers = {
-            'Authorization': f'Bearer {self.scoped_token}',
-            'Content-Type': 'application/json'
-        }
+        url = self._status_url
         
         payload = {
             'channel_names': [self.channel_name]
         }
-        
+
         try:
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
+            response = self._http.post(url, json=payload)
             response.raise_for_status()
             
-            data = response.json()
+            data = self._parse(response)
             channel_statuses = data.get('channel_statuses', {})
             channel_status = channel_statuses.get(self.channel_name, {})
             
             committed_offset = channel_status.get('committed_offset_token', 0)
-            logger.debug(f"Channel committed offset: {committed_offset}")
+            if committed_offset:
+                self._last_known_committed = int(committed_offset)
+            logger.debug("Channel committed offset: %s", committed_offset)
             
             return channel_status
             
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to get channel status: {e}")
-            if hasattr(e.response, 'text'):
-                logger.error(f"Response: {e.response.text}")
+        except httpx.HTTPError as e:
+            logger.error("Failed to get channel status: %s", e)
+            if isinstance(e, httpx.HTTPStatusError):
+                if e.response.status_code in (401, 403):
+                    self._invalidate_token()
+                logger.error("Response: %s", e.response.text)
             raise
     
-    def wait_for_commit(self, expected_offset: int, timeout: int = 60, poll_interval: int = 2) -> bool:
+    def wait_for_commit(self, expected_offset: int, timeout: int = 60,
+                        poll_interval: float = 0.5) -> bool:
         """
         Wait for data to be committed to Snowflake.
         
+        Returns immediately when an append response already reported the
+        offset as committed; otherwise polls with exponential backoff
+        (poll_interval doubling up to 5s) to keep status round-trips rare.
+        
         Args:
             expected_offset: The offset we're waiting to be committed
             timeout: Maximum time to wait in seconds
-            poll_interval: How often to poll for status in seconds
+            poll_interval: Initial delay between status polls in seconds
             
         Returns:
             True if committed, False if timeout
         """
-        logger.info(f"Waiting for offset {expected_offset} to be committed...")
+        if self._last_known_committed >= expected_offset:
+            logger.info("Data committed! Offset: %s", self._last_known_committed)
+            return True
+
+        logger.info("Waiting for offset %s to be committed...", expected_offset)
         
-        start_time = time.time()
-        while time.time() - start_time < timeout:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
             try:
                 status = self.get_channel_status()
                 committed_offset = status.get('committed_offset_token', 0)
                 
                 if committed_offset >= expected_offset:
-                    logger.info(f"Data committed! Offset: {committed_offset}")
+                    logger.info("Data committed! Offset: %s", committed_offset)
                     return True
                 
-                logger.debug(f"Waiting... committed={committed_offset}, expected={expected_offset}")
+                logger.debug("Waiting... committed=%s, expected=%s", committed_offset, expected_offset)
                 time.sleep(poll_interval)
                 
             except Exception as e:
-                logger.warning(f"Error checking status: {e}")
+                logger.warning("Error checking status: %s", e)
                 time.sleep(poll_interval)
+
+            poll_interval = min(poll_interval * 2, 5.0)
         
-        logger.warning(f"Timeout waiting for commit after {timeout}s")
+        logger.warning("Timeout waiting for commit after %ss", timeout)
         return False
-    
+
+    async def wait_for_commit_async(self, expected_offset: int, timeout: int = 60,
+                                    poll_interval: float = 0.5) -> bool:
+        """
+        Async counterpart of wait_for_commit.
+
+        Polls with asyncio.sleep so other tasks (the sensor collector, an
+        in-flight append) keep running while we wait on Snowflake, with the
+        same append-response short-circuit and exponential backoff.
+        """
+        if self._last_known_committed >= expected_offset:
+            logger.info("Data committed! Offset: %s", self._last_known_committed)
+            return True
+
+        logger.info("Waiting for offset %s to be committed...", expected_offset)
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                status = await asyncio.to_thread(self.get_channel_status)
+                committed_offset = status.get('committed_offset_token', 0)
+
+                if committed_offset >= expected_offset:
+                    logger.info("Data committed! Offset: %s", committed_offset)
+                    return True
+
+                logger.debug("Waiting... committed=%s, expected=%s", committed_offset, expected_offset)
+                await asyncio.sleep(poll_interval)
+
+            except Exception as e:
+                logger.warning("Error checking status: %s", e)
+                await asyncio.sleep(poll_interval)
+
+            poll_interval = min(poll_interval * 2, 5.0)
+
+        logger.warning("Timeout waiting for commit after %ss", timeout)
+        return False
+
+    async def aclose(self):
+        """Close the async HTTP client (call from the event loop on shutdown)."""
+        if self._ahttp is not None:
+            await self._ahttp.aclose()
+            self._ahttp = None
+
     def close_channel(self):
         """Close the streaming channel (optional - channels auto-close after inactivity)."""
-        logger.info(f"Closing channel: {self.channel_name}")
+        logger.info("Closing channel: %s", self.channel_name)
+        if self._pending and self.continuation_token:
+            self.flush()
         # Note: The REST API doesn't have an explicit close endpoint
         # Channels automatically close after period of inactivity
+        self._http.close()
+        # A closed client can't flush anyway, and leaving the hook
+        # registered would pin this instance for the process lifetime
+        atexit.unregister(self._flush_at_exit)
         logger.info("Channel will auto-close after inactivity period")
     
     def print_statistics(self):
         """Print ingestion statistics."""
-        elapsed_time = time.time() - self.stats['start_time']
+        elapsed_time = time.monotonic() - self.stats['start_time']
         
         logger.info("=" * 60)
         logger.info("INGESTION STATISTICS")
         logger.info("=" * 60)
-        logger.info(f"Total rows sent: {self.stats['total_rows_sent']}")
-        logger.info(f"Total batches: {self.stats['total_batches']}")
-        logger.info(f"Total bytes sent: {self.stats['total_bytes_sent']:,}")
-        logger.info(f"Errors: {self.stats['errors']}")
-        logger.info(f"Elapsed time: {elapsed_time:.2f} seconds")
+        logger.info("Total rows sent: %s", self.stats['total_rows_sent'])
+        logger.info("Total batches: %s", self.stats['total_batches'])
+        logger.info("Total bytes sent: %s", format(self.stats['total_bytes_sent'], ','))
+        logger.info("Errors: %s", self.stats['errors'])
+        logger.info("Elapsed time: %.2f seconds", elapsed_time)
         
         if self.stats['total_rows_sent'] > 0:
             rows_per_sec = self.stats['total_rows_sent'] / elapsed_time
-            logger.info(f"Average throughput: {rows_per_sec:.2f} rows/sec")
+            logger.info("Average throughput: %.2f rows/sec", rows_per_sec)
         
-        logger.info(f"Current offset token: {self.offset_token}")
+        logger.info("Current offset token: %s", self.offset_token)
         logger.info("=" * 60)
 
 
+class MultiChannelClient:
+    """
+    Fan ingest out across several Snowpipe Streaming channels.
+
+    Snowpipe scales horizontally with channels: while one channel waits on
+    its commit response another can be uploading. This wrapper owns
+    config.get('parallel_channels', 4) sub-clients, each with a _0.._N-1
+    channel-name suffix and a dedicated single-worker thread (per-channel
+    offset/token state is not thread-safe, so one thread per channel keeps
+    each commit stream strictly ordered). The sub-clients share one
+    HTTP/2 connection pool, JWT auth state, and token lock.
+    """
+
+    def __init__(self, config_file: str = 'snowflake_config.json'):
+        first = SnowpipeStreamingClient(config_file)
+        self.config = first.config
+        self.parallel_channels = max(1, int(self.config.get('parallel_channels', 4)))
+
+        self.clients = [first]
+        for _ in range(1, self.parallel_channels):
+            sub = SnowpipeStreamingClient(config_file)
+            # Share the pooled connection and auth state with the first
+            # client so N channels don't mean N TLS handshakes or N
+            # simultaneous token refreshes
+            sub._http.close()
+            sub._http = first._http
+            sub.jwt_auth = first.jwt_auth
+            sub._token_lock = first._token_lock
+            self.clients.append(sub)
+
+        base = first.channel_name
+        for i, sub in enumerate(self.clients):
+            sub.channel_name = f"{base}_{i}"
+
+        self._pools = [
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'snowpipe-ch{i}')
+            for i in range(self.parallel_channels)
+        ]
+        self._next = 0
+
+    def discover_ingest_host(self) -> str:
+        """Discover the ingest host once and share it with every channel."""
+        host = self.clients[0].discover_ingest_host()
+        for sub in self.clients[1:]:
+            sub.control_host = self.clients[0].control_host
+            sub.ingest_host = host
+            sub._build_urls()
+        return host
+
+    def open_channel(self):
+        """Open every channel (round-trips overlap on the worker threads)."""
+        futures = [
+            pool.submit(sub.open_channel)
+            for sub, pool in zip(self.clients, self._pools)
+        ]
+        return [f.result() for f in futures]
+
+    def insert_rows(self, rows):
+        """
+        Round-robin a batch to the next channel's worker thread.
+
+        Returns a Future resolving to the number of rows that channel
+        sent, so callers can overlap several batches and join later.
+        """
+        sub = self.clients[self._next]
+        pool = self._pools[self._next]
+        self._next = (self._next + 1) % self.parallel_channels
+        return pool.submit(sub.insert_rows, rows)
+
+    def flush(self) -> int:
+        """Flush every channel's pending buffer; returns total rows sent."""
+        futures = [
+            pool.submit(sub.flush)
+            for sub, pool in zip(self.clients, self._pools)
+        ]
+        return sum(f.result() for f in futures)
+
+    def close_channel(self):
+        """Flush and shut down all channels, then the shared connection."""
+        for sub, pool in zip(self.clients, self._pools):
+            pool.submit(sub.flush).result()
+            pool.shutdown(wait=True)
+        # Each sub unregisters its own atexit hook; closing the shared
+        # httpx client more than once is a no-op
+        for sub in self.clients:
+            sub.close_channel()
+
+    def print_statistics(self):
+        """Print per-channel ingestion statistics."""
+        for sub in self.clients:
+            sub.print_statistics()
+
+
 def main():
     """Main entry point for testing."""
     logger.info("Starting Thermal Streaming Client Test")
@@ -498,6 +1137,14 @@ def main():
         # Sample thermal data (simulating your sensor)
         import socket
         actual_hostname = socket.gethostname()
+
+        # Format the timestamps once per batch and reuse across rows: the
+        # strftime/isoformat pair is surprisingly costly per row on a Pi
+        ts = int(time.time())
+        dt = datetime.fromtimestamp(ts, timezone.utc)
+        starttime = dt.strftime("%m/%d/%Y %H:%M:%S")
+        datetimestamp = dt.isoformat()
+
         sample_data = {
             "uuid": "thrml_lgu_20250721181107",
             "ipaddress": "192.168.1.175",
@@ -513,9 +1160,9 @@ def main():
             "memory": 10.0,
             "rowid": "20250721181107_aaa0541d-135c-4156-9ad4-5de877f84d5c",
             "systemtime": "07/21/2025 14:11:08",
-            "ts": int(time.time()),
-            "starttime": datetime.now(timezone.utc).strftime("%m/%d/%Y %H:%M:%S"),
-            "datetimestamp": datetime.now(timezone.utc).isoformat(),
+            "ts": ts,
+            "starttime": starttime,
+            "datetimestamp": datetimestamp,
             "temperature": 27.1031,
             "humidity": 48.05,
             "co2": 988.0,
@@ -538,7 +1185,7 @@ def main():
         logger.info("Test completed successfully!")
         
     except Exception as e:
-        logger.error(f"Error in main: {e}", exc_info=True)
+        logger.error("Error in main: %s", e, exc_info=True)
         sys.exit(1)
 
 